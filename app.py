@@ -1,62 +1,165 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 import sys
 import os
-import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Polars accelerates the performance-table aggregation when available
+try:
+    import polars as pl
+except ImportError:
+    pl = None
 
 # Ensure modules folder is in path
 module_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "modules"))
 if module_path not in sys.path:
     sys.path.append(module_path)
 
-from auth import TaigaAuth
-from fetcher import TaigaFetcher
 from visualizer import TaigaVisualizer
+from modules.connection import init_connection, fetch_fresh_data
 
 st.set_page_config(page_title="Taiga Monitor Report", layout="wide")
 
-# Shared, cross-session cooldown state
-@st.cache_resource
-def blocked_state():
-    return {"until": 0}
-
-# --- CONNECTION CACHING ---
-@st.cache_resource(ttl=3600)
-def init_connection():
-    # Check shared cooldown to avoid spamming the API
-    if blocked_state()["until"] > time.time():
-        return None, None, None
-
-    auth = TaigaAuth()
-    try:
-        if auth.login():
-            project = auth.get_project()
-            maps = auth.get_maps()
-            return auth.api, project, maps
-    except Exception as e:
-        if "<html>" in str(e).lower() or "waiting for the redirection" in str(e).lower():
-            blocked_state()["until"] = time.time() + 900
-        init_connection.clear()
-    return None, None, None
-
-# --- DATA FETCHING ---
-def fetch_fresh_data(api, project, maps):
-    """Pulls new data with extreme caution."""
-    fetcher = TaigaFetcher(api, project, maps)
-    try:
-        # Brief pause to 'cool down' before the first API call
-        time.sleep(2)
-        return fetcher.get_all_stories()
-    except Exception as e:
-        if "firewall_blocked" in str(e).lower() or "<html>" in str(e).lower():
-            st.error("Firewall redirection detected.")
-            st.info("The server is challenging the connection. Please close this tab and wait 15 minutes.")
-            blocked_state()["until"] = time.time() + 900
-            st.stop()
-
-        st.cache_resource.clear()
-        st.rerun()
+# --- VISUALIZER / FIGURE CACHING ---
+@st.cache_data(show_spinner=False)
+def filter_stories(df_hash, months, year):
+    """Apply the month/year filter once per (data, filter) combination."""
+    df = st.session_state['df_raw']
+    if 'Created Date' in df.columns:
+        dates = pd.to_datetime(df['Created Date'])
+        mask = dates.dt.year == year
+        if months:
+            mask &= dates.dt.month.isin(months)
+        df = df[mask]
+    return df.copy()
+
+@st.cache_data(show_spinner=False)
+def build_viz(df_hash, months, year):
+    # df_hash keys the cache; the raw frame itself lives in session state.
+    # The frame is pre-filtered, so the visualizer skips its own masking.
+    return TaigaVisualizer(filter_stories(df_hash, months, year))
+
+@st.cache_data(show_spinner=False)
+def make_fig(df_hash, months, year, plot_name):
+    """Render one named plot and cache the resulting Figure."""
+    viz = build_viz(df_hash, months, year)
+    fig = getattr(viz, plot_name)()
+    plt.close(fig)
+    return fig
+
+# --- TAB RENDERING ---
+# Each tab is an isolated fragment: interactions inside one tab no longer
+# re-render the plots of the other two.
+@st.fragment
+def _render_tab1(df_hash, months_key, viz):
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Status Distribution")
+        st.pyplot(make_fig(df_hash, months_key, 2026, 'plot_status_distribution'))
+    with col2:
+        st.subheader("Prioritas Pekerjaan")
+        st.pyplot(make_fig(df_hash, months_key, 2026, 'plot_priority_pie'))
+
+    st.markdown("---")
+    st.header("📌 Project Assignment Matrix")
+    fig, report_df = viz.plot_project_assignment_matrix()
+    if fig:
+        st.pyplot(fig)
+        plt.close(fig)
+        st.subheader("📋 Project Assignment Details")
+        # One hash-indexed pass instead of a boolean mask per project
+        for project_name, group in report_df.groupby('Project', sort=False, observed=True):
+            with st.expander(f"Project: {project_name}"):
+                st.dataframe(group[['Subject', 'Assigned To', 'Status']].sort_values('Status'),
+                             hide_index=True, use_container_width=True)
+    else:
+        st.warning("⚠️ 'Project' column missing. Click 'Sync Data' to refresh.")
+
+@st.fragment
+def _render_tab2(df_hash, months_key):
+    st.header("Efficiency, Bottleneck & Work Connections")
+    st.subheader("Koneksi: Tipe Proyek vs Tipe Pekerjaan")
+    st.pyplot(make_fig(df_hash, months_key, 2026, 'plot_connection_heatmap'), use_container_width=True)
+    st.markdown("---")
+    st.subheader("Efficiency by Priority")
+    st.pyplot(make_fig(df_hash, months_key, 2026, 'plot_efficiency_by_priority'), use_container_width=True)
+    st.markdown("---")
+    st.subheader("Bottleneck Analysis (Avg Time per Phase)")
+    st.pyplot(make_fig(df_hash, months_key, 2026, 'plot_bottleneck_analysis'), use_container_width=True)
+
+PERF_COLS = ['Assigned To', 'Points', 'In progress_mins', 'ID', 'Project Type', 'Work Type']
+
+def build_perf(viz):
+    """Aggregate the personnel performance table from the filtered frame."""
+    if pl is not None:
+        # Polars' multithreaded hash grouper handles the string list-aggs
+        # far better than a pandas groupby with Python lambdas
+        perf = (
+            pl.from_pandas(viz.df[PERF_COLS]).lazy()
+            .group_by('Assigned To', maintain_order=True)
+            .agg(
+                pl.col('ID').count().alias('Jumlah Kartu'),
+                pl.col('Points').sum().alias('Total Unit Pekerjaan'),
+                pl.col('In progress_mins').sum(),
+                pl.col('Project Type').cast(pl.String).unique(maintain_order=True).str.join(', ').alias('Tipe Proyek'),
+                pl.col('Work Type').cast(pl.String).unique(maintain_order=True).str.join(', ').alias('Tipe Pekerjaan'),
+            )
+            .collect()
+            .to_pandas()
+            .set_index('Assigned To')
+        )
+    else:
+        # Single groupby pass: all five aggregations share one group index
+        perf = viz.df.groupby('Assigned To', sort=False, observed=True).agg(**{
+            'Jumlah Kartu': ('ID', 'count'),
+            'Total Unit Pekerjaan': ('Points', 'sum'),
+            'In progress_mins': ('In progress_mins', 'sum'),
+            'Tipe Proyek': ('Project Type', lambda s: ', '.join(pd.unique(s))),
+            'Tipe Pekerjaan': ('Work Type', lambda s: ', '.join(pd.unique(s)))
+        })
+
+    perf['Total Durasi In Progress'] = viz._format_mins_to_dhm_vec(perf['In progress_mins'].to_numpy())
+    # Zero-safe ratio: personnel with 0 points get 0 instead of inf
+    mins = perf['In progress_mins'].to_numpy(dtype=np.float64)
+    units = perf['Total Unit Pekerjaan'].to_numpy(dtype=np.float64)
+    ratio = np.divide(mins, units, out=np.zeros_like(mins), where=units != 0)
+    perf['Efisiensi (Waktu/Unit)'] = viz._format_mins_to_hm_vec(ratio.astype(np.int64))
+    return perf
+
+@st.fragment
+def _render_tab3(df_hash, months_key, viz):
+    st.header("Personnel Performance & Velocity")
+    # Skip the aggregation when the filter change didn't alter the row set
+    perf_hash = int(pd.util.hash_pandas_object(viz.df[PERF_COLS], index=False).sum())
+    if st.session_state.get('_perf_hash') != perf_hash:
+        st.session_state['_perf'] = build_perf(viz)
+        st.session_state['_perf_hash'] = perf_hash
+    perf = st.session_state['_perf']
+
+    st.subheader("📊 Laporan Performa Personil")
+    st.dataframe(perf.drop(columns=['In progress_mins']).sort_values('Total Unit Pekerjaan', ascending=False), use_container_width=True)
+
+    # Render the three independent figures in parallel: each plot draws on
+    # its own Figure (Agg is thread-safe per Figure), so the drawing time
+    # overlaps instead of accumulating
+    plot_names = ['plot_bottleneck_heatmap', 'plot_priority_mix_stacked', 'plot_total_work_units']
+    with ThreadPoolExecutor(max_workers=len(plot_names)) as ex:
+        futures = {name: ex.submit(make_fig, df_hash, months_key, 2026, name) for name in plot_names}
+        figs = {name: fut.result() for name, fut in futures.items()}
+
+    st.markdown("---")
+    st.subheader("🌡️ Heatmap Efisiensi (Waktu per Poin)")
+    st.pyplot(figs['plot_bottleneck_heatmap'], use_container_width=True)
+
+    st.markdown("---")
+    st.subheader("Priority Mix per Personnel")
+    st.pyplot(figs['plot_priority_mix_stacked'], use_container_width=True)
+
+    st.markdown("---")
+    st.subheader("Total Work Units (Points)")
+    st.pyplot(figs['plot_total_work_units'], use_container_width=True)
 
 def main():
     st.title("📊 Taiga Engineering Performance Dashboard")
@@ -103,91 +206,25 @@ def main():
             default=["Jan"]
         )
         month_filter = [month_labels[m] for m in selected_month_labels]
-        
-        # Initialize Visualizer
-        viz = TaigaVisualizer(df_raw, month=month_filter, year=2026)
+
+        # Cache keys: figures are only re-rendered when the data or filter changes
+        df_hash = int(pd.util.hash_pandas_object(df_raw, index=True).sum())
+        months_key = tuple(month_filter)
+
+        # Initialize Visualizer (cached per data/filter combination)
+        viz = build_viz(df_hash, months_key, 2026)
 
         # --- UI LAYOUT ---
         tab1, tab2, tab3 = st.tabs(["Overview", "Efficiency & Bottleneck", "Performance Analysis"])
 
         with tab1:
-            col1, col2 = st.columns(2)
-            with col1:
-                st.subheader("Status Distribution")
-                viz.plot_status_distribution()
-                st.pyplot(plt.gcf())
-                plt.clf() 
-            with col2:
-                st.subheader("Prioritas Pekerjaan")
-                viz.plot_priority_pie()
-                st.pyplot(plt.gcf())
-                plt.clf()
-
-            st.markdown("---")
-            st.header("📌 Project Assignment Matrix")
-            fig, report_df = viz.plot_project_assignment_matrix()
-            if fig:
-                st.pyplot(fig)
-                plt.clf()
-                st.subheader("📋 Project Assignment Details")
-                projects = report_df['Project'].unique()
-                for project_name in projects:
-                    with st.expander(f"Project: {project_name}"):
-                        group = report_df[report_df['Project'] == project_name]
-                        st.table(group[['Subject', 'Assigned To', 'Status']].sort_values('Status'))
-            else:
-                st.warning("⚠️ 'Project' column missing. Click 'Sync Data' to refresh.")
+            _render_tab1(df_hash, months_key, viz)
 
         with tab2:
-            st.header("Efficiency, Bottleneck & Work Connections")
-            st.subheader("Koneksi: Tipe Proyek vs Tipe Pekerjaan")
-            viz.plot_connection_heatmap()
-            st.pyplot(plt.gcf(), use_container_width=True)
-            plt.clf() 
-            st.markdown("---")
-            st.subheader("Efficiency by Priority")
-            viz.plot_efficiency_by_priority()
-            st.pyplot(plt.gcf(), use_container_width=True)
-            plt.clf()
-            st.markdown("---")
-            st.subheader("Bottleneck Analysis (Avg Time per Phase)")
-            viz.plot_bottleneck_analysis()
-            st.pyplot(plt.gcf(), use_container_width=True)
-            plt.clf()
+            _render_tab2(df_hash, months_key)
 
         with tab3:
-            st.header("Personnel Performance & Velocity")
-            perf = viz.df.groupby('Assigned To').agg({
-                'ID': 'count',
-                'Points': 'sum',
-                'In progress_mins': 'sum'
-            }).rename(columns={'ID': 'Jumlah Kartu', 'Points': 'Total Unit Pekerjaan'})
-
-            perf['Total Durasi In Progress'] = perf['In progress_mins'].apply(viz._format_mins_to_dhm)
-            perf['Efisiensi (Waktu/Unit)'] = (perf['In progress_mins'] / perf['Total Unit Pekerjaan']).apply(viz._format_mins_to_hm)
-            perf['Tipe Proyek'] = viz.df.groupby('Assigned To')['Project Type'].apply(lambda x: ', '.join(x.unique()))
-            perf['Tipe Pekerjaan'] = viz.df.groupby('Assigned To')['Work Type'].apply(lambda x: ', '.join(x.unique()))
-
-            st.subheader("📊 Laporan Performa Personil")
-            st.dataframe(perf.drop(columns=['In progress_mins']).sort_values('Total Unit Pekerjaan', ascending=False), use_container_width=True)
-            
-            st.markdown("---")
-            st.subheader("🌡️ Heatmap Efisiensi (Waktu per Poin)")
-            fig_heatmap = viz.plot_bottleneck_heatmap()
-            st.pyplot(fig_heatmap, use_container_width=True)
-            plt.clf()
-
-            st.markdown("---")
-            st.subheader("Priority Mix per Personnel")
-            viz.plot_priority_mix_stacked()
-            st.pyplot(plt.gcf(), use_container_width=True)
-            plt.clf()
-            
-            st.markdown("---")
-            st.subheader("Total Work Units (Points)")
-            viz.plot_total_work_units()
-            st.pyplot(plt.gcf(), use_container_width=True)
-            plt.clf()
+            _render_tab3(df_hash, months_key, viz)
 
     else:
         st.error("🛑 **Access Temporarily Blocked by Taiga Firewall.**")
@@ -1,5 +1,78 @@
 import streamlit as st
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from taiga import TaigaAPI
+from taiga.exceptions import TaigaRestException
+import taiga.requestmaker as taiga_requestmaker
+
+# orjson decodes the large story/history payloads several times faster
+# than stdlib json; fall back silently when it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class FirewallBlocked(Exception):
+    """Raised when the server answers with an HTML challenge page instead of JSON."""
+
+def _raise_on_html(resp, *args, **kwargs):
+    # One O(1) header check at the response layer replaces substring scans
+    # over every exception message (which can embed the whole HTML blob)
+    if 'html' in resp.headers.get('content-type', ''):
+        raise FirewallBlocked(
+            "Access Blocked by Firewall: Taiga is returning an HTML challenge page. "
+            "Your IP might be temporarily rate-limited. Please wait 5-10 minutes."
+        )
+
+class _PooledRequests:
+    """Minimal stand-in for the requests module backed by a pooled Session.
+
+    python-taiga calls module-level requests.get/post/... for every API
+    request, paying a fresh TCP+TLS handshake each time. This shim routes
+    those calls through one keep-alive Session with connection pooling and
+    retries, while forwarding the module attributes the library touches.
+    """
+    def __init__(self, session):
+        self.session = session
+        self.exceptions = requests.exceptions
+        self.packages = requests.packages
+        self.get = session.get
+        self.post = session.post
+        self.put = session.put
+        self.patch = session.patch
+        self.delete = session.delete
+
+def _install_pooled_session():
+    if isinstance(getattr(taiga_requestmaker, 'requests', None), _PooledRequests):
+        return
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=20, pool_maxsize=20,
+        max_retries=Retry(total=3, backoff_factor=0.5,
+                          status_forcelist=[429, 502, 503, 504],
+                          allowed_methods=["GET"])
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if orjson is not None:
+        # Rebind .json() on every response so python-taiga's parsing of
+        # the raw bytes goes through orjson instead of stdlib json
+        def _fast_json(resp, *args, **kwargs):
+            resp.json = lambda **kw: orjson.loads(resp.content)
+        session.hooks['response'].append(_fast_json)
+    session.hooks['response'].append(_raise_on_html)
+    taiga_requestmaker.requests = _PooledRequests(session)
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_member_map(_api, project_id):
+    """Build the member id → name map from one raw /users JSON pass.
+
+    Bypasses the ORM: no per-member model construction, just a dict-comp
+    over the already-parsed response. Cached per project across reruns.
+    """
+    users_json = _api.raw_request.get('users', query={'project': project_id}).json()
+    return {u['id']: u.get('full_name_display') or u.get('full_name', '') for u in users_json}
 
 class TaigaAuth:
     def __init__(self):
@@ -14,55 +87,53 @@ class TaigaAuth:
         url = st.secrets["TAIGA_URL"]
 
         def verify_connection(api_instance):
-            """Internal helper to verify the API returned valid data, not HTML."""
-            try:
-                # The 'me()' method returns a User object representing the logged-in user
-                # Calling it serves as a lightweight health check for the connection
-                api_instance.me() 
-                return True
-            except Exception as e:
-                err_str = str(e).lower()
-                # Check for common firewall/rate-limit indicators in the response
-                if "<html>" in err_str or "doctype" in err_str or "bitninja" in err_str:
-                    raise Exception(
-                        "Access Blocked by Firewall: Taiga is returning an HTML challenge page. "
-                        "Your IP might be temporarily rate-limited. Please wait 5-10 minutes."
-                    )
-                raise e
+            """Internal helper to verify the API answers with valid data.
+
+            The 'me()' call is a lightweight health check; an HTML challenge
+            page surfaces as FirewallBlocked via the session response hook.
+            """
+            api_instance.me()
+            return True
+
+        # Normalize the host once: the library appends /api/v1/ itself, so a
+        # single attempt covers both cloud and self-hosted instances. The old
+        # try-basic-then-fallback dance burned an extra auth round-trip that
+        # counted toward the firewall rate limit.
+        base_url = url.split('/api/v1')[0].rstrip('/') if '/api/v1' in url else url.rstrip('/')
 
         try:
-            # 1. Try Basic Format (removes /api/v1/ suffix for standard cloud instances)
-            base_url = url.replace('/api/v1/', '').rstrip('/')
+            # All subsequent Taiga calls reuse one pooled keep-alive session
+            _install_pooled_session()
             self.api = TaigaAPI(host=base_url)
             self.api.auth(username=username, password=password)
-            
+
             if verify_connection(self.api):
-                print("✅ Authentication successful (Basic URL)!")
+                print("✅ Authentication successful!")
                 return True
-                
-        except Exception as first_err:
-            # If blocked by firewall, stop immediately to avoid further flagging
-            if "Blocked by Firewall" in str(first_err):
-                st.error(str(first_err))
-                return False
-                
-            try:
-                # 2. Fallback to Full URL (useful for some self-hosted instances)
-                print("🔐 Attempting fallback with full URL...")
-                self.api = TaigaAPI(host=url.rstrip('/'))
-                self.api.auth(username=username, password=password)
-                
-                if verify_connection(self.api):
-                    print("✅ Authentication successful (Fallback URL)!")
-                    return True
-            except Exception as final_err:
-                error_msg = str(final_err)
-                if "<html>" in error_msg.lower():
-                    st.error("⚠️ Server returned HTML (Firewall block). Try again in 10 minutes.")
-                else:
-                    st.error(f"❌ Authentication Failed: {error_msg}")
-                return False
-            
+        except FirewallBlocked as e:
+            st.error(str(e))
+            return False
+        except TaigaRestException as e:
+            # Only a 404 means the instance is not rooted at the normalized
+            # base — retry once with the URL exactly as configured. Any other
+            # failure (bad credentials, firewall) is surfaced immediately
+            # instead of burning a second doomed auth round-trip.
+            if e.status_code == 404 and base_url != url.rstrip('/'):
+                try:
+                    self.api = TaigaAPI(host=url.rstrip('/'))
+                    self.api.auth(username=username, password=password)
+                    if verify_connection(self.api):
+                        print("✅ Authentication successful (configured URL)!")
+                        return True
+                except Exception as retry_err:
+                    st.error(f"❌ Authentication Failed: {retry_err}")
+                    return False
+            st.error(f"❌ Authentication Failed: {e}")
+            return False
+        except Exception as e:
+            st.error(f"❌ Authentication Failed: {e}")
+            return False
+
     def get_project(self):
         if not self.api: return None
         slug = st.secrets["PROJECT_SLUG"]
@@ -71,8 +142,6 @@ class TaigaAuth:
 
     def get_maps(self):
         if not self.project: return {}
-        # Only fetch if not already in memory to save API calls
-        if not hasattr(self, '_cached_maps'):
-            member_map = {m.id: m.full_name for m in self.project.members}
-            self._cached_maps = {'members': member_map}
-        return self._cached_maps
\ No newline at end of file
+        # The cache_data layer survives Streamlit reruns; an instance
+        # attribute would not, since TaigaAuth is rebuilt every script run
+        return {'members': _cached_member_map(self.api, self.project.id)}
\ No newline at end of file
@@ -0,0 +1,93 @@
+# modules/connection.py
+import streamlit as st
+import pandas as pd
+import time
+from pathlib import Path
+
+from modules.auth import TaigaAuth, FirewallBlocked
+from modules.fetcher import TaigaFetcher
+
+# Shared, cross-session cooldown state
+@st.cache_resource
+def blocked_state():
+    return {"until": 0}
+
+# Timestamp of the last successful API round-trip (shared heartbeat)
+@st.cache_resource
+def heartbeat_state():
+    return {"last_ok": 0}
+
+# --- CONNECTION CACHING ---
+@st.cache_resource(ttl=3600)
+def init_connection():
+    # Check shared cooldown to avoid spamming the API
+    if blocked_state()["until"] > time.time():
+        return None, None, None
+
+    auth = TaigaAuth()
+    try:
+        if auth.login():
+            project = auth.get_project()
+            maps = auth.get_maps()
+            heartbeat_state()["last_ok"] = time.time()
+            return auth.api, project, maps
+    except FirewallBlocked:
+        blocked_state()["until"] = time.time() + 900
+        init_connection.clear()
+    except Exception:
+        init_connection.clear()
+    return None, None, None
+
+# --- ON-DISK CACHE ---
+# Shared across sessions: one fetch fills the cache for everyone.
+CACHE_DIR = Path(".cache")
+CACHE_TTL_SECONDS = 3600
+
+def _cache_path(project):
+    return CACHE_DIR / f"taiga_stories_{project.id}.parquet"
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _read_story_cache(path_str, mtime):
+    # Keyed by mtime so a fresh fetch invalidates the in-memory copy
+    return pd.read_parquet(path_str, engine="pyarrow")
+
+# Low-cardinality string columns: stored as category so every downstream
+# groupby/pivot works on integer codes instead of Python strings
+CATEGORY_COLS = ['Assigned To', 'Project Type', 'Work Type', 'Project', 'Status', 'Priority']
+
+def _categorize(df):
+    for c in CATEGORY_COLS:
+        if c in df.columns:
+            df[c] = df[c].astype('category')
+    return df
+
+# --- DATA FETCHING ---
+def fetch_fresh_data(api, project, maps):
+    """Pulls new data with extreme caution."""
+    # Serve from the shared Parquet cache if it is still fresh —
+    # avoids hitting the Taiga API at all for most sessions.
+    cache_file = _cache_path(project)
+    if cache_file.exists():
+        mtime = cache_file.stat().st_mtime
+        if time.time() - mtime < CACHE_TTL_SECONDS:
+            return _read_story_cache(str(cache_file), mtime)
+
+    fetcher = TaigaFetcher(api, project, maps)
+    try:
+        # Brief pause to 'cool down' before the first API call, skipped
+        # when the connection proved itself alive within the last minute
+        if time.time() - heartbeat_state()["last_ok"] > 60:
+            time.sleep(2)
+        df = _categorize(fetcher.get_all_stories())
+        heartbeat_state()["last_ok"] = time.time()
+        CACHE_DIR.mkdir(exist_ok=True)
+        df.to_parquet(cache_file, engine="pyarrow", compression="zstd")
+        return df
+    except FirewallBlocked:
+        st.error("Firewall redirection detected.")
+        st.info("The server is challenging the connection. Please close this tab and wait 15 minutes.")
+        blocked_state()["until"] = time.time() + 900
+        st.stop()
+    except Exception:
+        st.cache_resource.clear()
+        st.rerun()
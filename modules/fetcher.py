@@ -1,161 +1,282 @@
 import streamlit as st
 import pandas as pd
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from modules.processor import TaigaProcessor
-import time
+import pyarrow as pa
+import aiohttp
+import asyncio
+import diskcache
+import json
+from aiolimiter import AsyncLimiter
+from concurrent.futures import ThreadPoolExecutor
+from modules.auth import FirewallBlocked
+from modules.processor import get_processor
 import random
-import threading
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Concurrent history requests kept low to avoid firewall triggers
+HISTORY_CONCURRENCY = 5
+# Token-bucket budget: the firewall cares about req/sec, not spacing, so
+# bursts up to the bucket size go out immediately
+HISTORY_RATE_PER_SEC = 5
+# Stories are listed page by page so the server streams small responses
+# instead of assembling one giant payload
+STORY_PAGE_SIZE = 100
+
+# Rerun-level caches: leading-underscore args are excluded from the cache key
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_status_map(_api, project_id):
+    return {s.id: s.name for s in _api.user_story_statuses.list(project=project_id)}
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_stories(_fetcher, project_id, members_hash):
+    return _fetcher._fetch_all_stories()
+
+@st.cache_resource
+def _history_cache():
+    # Conditional-GET store shared across sessions:
+    # {story_id: (etag, last_modified, payload)}
+    return diskcache.Cache('.cache/history')
 
 class TaigaFetcher:
     def __init__(self, api, project, maps):
         self.api = api
         self.project = project
         self.maps = maps
-        self.processor = TaigaProcessor()
-
-        # Fetch all statuses once at the start
-        project_statuses = self.api.user_story_statuses.list(project=self.project.id)
-        self.status_map = {s.id: s.name for s in project_statuses}
-        # Shared rate limiter across threads to avoid tripping firewall
-        self._rate_lock = threading.Lock()
-        self._last_call_ts = 0.0
-        self._min_interval = 0.6  # seconds between history calls (safe-ish)
-    
-    def fetch_single_story_data(self, story):
-        """Helper function to fetch history and extract data for one story."""
-        # This part runs in parallel for multiple stories
-        history_entries = self._safe_get_story_history(story.id)
-        return self._extract_story_data(story, history_entries)
+        self.processor = get_processor()
 
+        # Fetch all statuses once per project (survives Streamlit reruns)
+        self.status_map = _cached_status_map(self.api, self.project.id)
+    
     def get_all_stories(self):
-        """Get all user stories as DataFrame using safer parallel fetching."""
-        stories = self.api.user_stories.list(project=self.project.id, pagination=False)
-        results = []
-        my_bar = st.progress(0, text="Fetching stories (safe parallel mode)...")
-
-        # Conservative concurrency to reduce firewall triggers
-        max_workers = 2
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_map = {executor.submit(self.fetch_single_story_data, s): s for s in stories}
-            for i, future in enumerate(as_completed(future_map)):
-                results.append(future.result())
-                my_bar.progress((i + 1) / len(stories))
+        """Get all user stories as DataFrame, cached across Streamlit reruns."""
+        members_hash = hash(tuple(sorted(self.maps['members'].items())))
+        return _cached_stories(self, self.project.id, members_hash)
+
+    def _fetch_all_stories(self):
+        """Uncached fetch: pulls stories + histories and builds the frame."""
+        stories = self._list_stories_parallel()
+
+        # Pull every history up front, then extract without further I/O
+        histories = self._bulk_fetch_histories([s['id'] for s in stories])
+        return self._build_frame(stories, histories)
+
+    def _list_stories_parallel(self):
+        """List all user stories as concurrent page-sized downloads.
+
+        A one-row probe reads X-Pagination-Count, then the pages are
+        fetched in parallel over the pooled session instead of asking the
+        server to assemble every story into one multi-megabyte response.
+
+        Returns the stories as plain dicts straight from the JSON payload:
+        everything the frame needs (tags, status_extra_info, assigned_users,
+        total_points) is already inline, so instantiating UserStory objects
+        would only add per-story model construction and the risk of lazy
+        attribute re-fetches.
+        """
+        probe = self.api.raw_request.get(
+            'userstories',
+            query={'project': self.project.id, 'page': 1, 'page_size': 1},
+            paginate=True)
+        total = int(probe.headers.get('x-pagination-count', 0) or 0)
+        if not total:
+            return []
+
+        pages = -(-total // STORY_PAGE_SIZE)
+        fetch_page = lambda page: self.api.raw_request.get(
+            'userstories',
+            query={'project': self.project.id, 'page': page,
+                   'page_size': STORY_PAGE_SIZE, 'include_attachments': 'false'},
+            paginate=True).json()
+        if pages == 1:
+            return fetch_page(1)
+        with ThreadPoolExecutor(max_workers=min(pages, HISTORY_CONCURRENCY)) as executor:
+            page_lists = list(executor.map(fetch_page, range(1, pages + 1)))
+        return [story for page in page_lists for story in page]
+
+    def _build_frame(self, stories, histories):
+        """Assemble the result frame column-wise (one pass per column)."""
+        if not stories:
+            return pd.DataFrame()
+
+        member_map = self.maps['members']
+        cats_list = [self._classify_tags(s.get('tags') or []) for s in stories]
+        durations = [self.processor.analyze_time(histories.get(s['id'], [])) for s in stories]
+
+        def story_fields(s):
+            """Pull every plain field in one pass over the raw story dict."""
+            user_ids = s.get('assigned_users') or []
+            names = [member_map.get(u_id, f"User:{u_id}") for u_id in user_ids]
+            return (s.get('id'),
+                    f"#{s.get('ref', 'N/A')}",
+                    s.get('subject', 'No Subject'),
+                    s.get('created_date'),
+                    s.get('total_points'),
+                    ', '.join(names) if names else 'Unassigned',
+                    s.get('status'),
+                    (s.get('status_extra_info') or {}).get('name') or None)
+
+        # One traversal of the story list, transposed straight into columns
+        (ids, refs, subjects, created, raw_points,
+         assigned, raw_status, extra) = map(list, zip(*(story_fields(s) for s in stories)))
+
+        # Clean integer points: None/0/garbage all default to 1
+        points = (pd.to_numeric(pd.Series(raw_points), errors='coerce')
+                  .fillna(1).astype(int).replace(0, 1))
+
+        # Resolve status names as one C-level map over the id column:
+        # status_extra wins when present, then the status map, then a
+        # readable fallback for ids the map doesn't know
+        status_ids = pd.Series(raw_status, dtype=object)
+        statuses = (pd.Series(extra, dtype=object)
+                    .fillna(status_ids.map(self.status_map))
+                    .fillna('Unknown ID: ' + status_ids.astype(str).fillna('None')))
+
+        columns = {
+            'ID': ids,
+            'Ref': refs,
+            'Subject': subjects,
+            'Project': [c['project_name'] for c in cats_list],
+            'Status': statuses.tolist(),
+            'Created Date': created,
+            'Assigned To': assigned,
+            'Priority': [c['priority'] for c in cats_list],
+            'Project Type': [c['project_type'] for c in cats_list],
+            'Work Type': [c['work'] for c in cats_list],
+            'Points': points.tolist(),
+        }
+        # Duration dicts share the same keys; transpose them into columns
+        for status in durations[0]:
+            columns[status] = [d[status] for d in durations]
+
+        # Assemble through Arrow: string columns come out as string[pyarrow]
+        # instead of object dtype, which groupby/agg handle much faster
+        df = pa.table(columns).to_pandas(types_mapper=pd.ArrowDtype)
+
+        # Encode low-cardinality columns as integer category codes right at
+        # the source. Status gets the known statuses first so every fetch
+        # shares one category order; observed extras are appended after.
+        status_cats = list(dict.fromkeys(list(self.status_map.values()) + statuses.tolist()))
+        df['Status'] = pd.Categorical(df['Status'], categories=status_cats)
+        for col in ('Priority', 'Project Type', 'Work Type', 'Project'):
+            df[col] = df[col].astype('category')
+        return df
+
+    def _bulk_fetch_histories(self, story_ids):
+        """Fetch the history of every story up front as {story_id: entries}.
+
+        Taiga has no project-wide history endpoint, so this still issues one
+        GET per story — but as a single asyncio fan-out: one event loop
+        multiplexes all sockets instead of GIL-bound worker threads.
+        """
+        if not story_ids:
+            return {}
+        return asyncio.run(self._afetch_histories(story_ids))
+
+    async def _afetch_histories(self, story_ids):
+        histories = {}
+        my_bar = st.progress(0, text="Fetching stories (safe async mode)...")
+
+        headers = {
+            'Authorization': f"{self.api.token_type} {self.api.token}",
+            'x-disable-pagination': 'True',
+        }
+        base_url = f"{self.api.host}/api/v1/history/userstory"
+        semaphore = asyncio.Semaphore(HISTORY_CONCURRENCY)
+        limiter = AsyncLimiter(HISTORY_RATE_PER_SEC, 1)
+        connector = aiohttp.TCPConnector(limit=HISTORY_CONCURRENCY)
+
+        async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
+            async def fetch_one(story_id):
+                async with semaphore, limiter:
+                    entries = await self._safe_get_history_async(
+                        session, f"{base_url}/{story_id}", story_id)
+                return story_id, entries
+
+            tasks = [asyncio.create_task(fetch_one(sid)) for sid in story_ids]
+            # Each progress update is a websocket message plus a client
+            # reflow, so cap the whole fetch at ~20 updates
+            step = max(1, len(story_ids) // 20)
+            for i, task in enumerate(asyncio.as_completed(tasks)):
+                story_id, entries = await task
+                histories[story_id] = entries
+                if i % step == 0 or i + 1 == len(story_ids):
+                    my_bar.progress((i + 1) / len(story_ids))
 
         my_bar.empty()
-        return pd.DataFrame(results)
+        return histories
+
+    async def _safe_get_history_async(self, session, url, story_id):
+        # Revalidate instead of re-downloading: closed stories never change,
+        # so the server answers a ~0-byte 304 for most of the project
+        cache = _history_cache()
+        cached = cache.get(story_id)
+        cond_headers = {}
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                cond_headers['If-None-Match'] = etag
+            if last_modified:
+                cond_headers['If-Modified-Since'] = last_modified
 
-    def _safe_get_story_history(self, story_id):
         attempts = 0
         while True:
-            try:
-                # Global rate limit across threads
-                with self._rate_lock:
-                    now = time.time()
-                    wait_for = self._min_interval - (now - self._last_call_ts)
-                    if wait_for > 0:
-                        time.sleep(wait_for + random.random() * 0.2)
-                    self._last_call_ts = time.time()
-                return self.api.history.user_story.get(story_id)
-            except Exception as e:
-                err = str(e).lower()
-                if "<html>" in err or "doctype" in err or "bitninja" in err:
-                    attempts += 1
-                    if attempts >= 3:
-                        raise Exception("firewall_blocked")
-                    backoff = min(10, 2 ** attempts) + random.random()
-                    time.sleep(backoff)
-                    continue
-                raise
-    
-    def _extract_story_data(self, story, history_entries):
-        """Extract story data with clean integer points (default 1)"""
-        tags = getattr(story, 'tags', []) or []
-        
-        # 1. Extract Tag Categories
-        priority = self._extract_tag(tags, 'priority')
-        project_type = self._extract_tag(tags, 'project_type')
-        work_type = self._extract_tag(tags, 'work')
-        project_name = self._extract_tag(tags, 'project_name')
-
-        # 2. Get durations from processor
-        durations = self.processor.analyze_time(history_entries)
-        
-        # 3. IMPROVED POINTS EXTRACTION
-        # Get raw total points, defaulting to None to catch unassigned stories
-        raw_points = getattr(story, 'total_points', None)
-        
-        if raw_points is None:
-            # Default to 1 if point is None or Not Assigned
-            real_points = 1
-        else:
-            try:
-                # Convert to float first (to handle strings like "1.0"), then to int
-                real_points = int(float(raw_points))
-                # If the value is 0 (often Taiga's default for "Closed" points), default to 1
-                if real_points == 0:
-                    real_points = 1
-            except (ValueError, TypeError):
-                real_points = 1
-
-        # 4. Extract assigned users
-        assigned_ids = getattr(story, 'assigned_users', []) or []
-        assigned_names = [self.maps['members'].get(u_id, f"User:{u_id}") for u_id in assigned_ids]
-        
-        result = {
-            'ID': getattr(story, 'id', None),
-            'Ref': f"#{getattr(story, 'ref', 'N/A')}",
-            'Subject': getattr(story, 'subject', 'No Subject'),
-            'Project': project_name,
-            'Status': self._get_status_name(story),
-            'Created Date': getattr(story, 'created_date', None),
-            'Assigned To': ', '.join(assigned_names) if assigned_names else 'Unassigned',
-            'Priority': priority,
-            'Project Type': project_type,
-            'Work Type': work_type,
-            'Points': real_points  # Now returns a clean integer
-        }
-        
-        result.update(durations)
-        return result
+            async with session.get(url, headers=cond_headers) as resp:
+                if resp.status == 304 and cached:
+                    return cached[2]
+                body = await resp.read()
+                head = body[:2048].lower()
+                # Firewall challenge pages come back as HTML, not JSON
+                blocked = ('html' in resp.headers.get('Content-Type', '')
+                           or b'<html>' in head or b'doctype' in head or b'bitninja' in head)
+                if not blocked:
+                    resp.raise_for_status()
+                    payload = _json_loads(body)
+                    etag = resp.headers.get('ETag')
+                    last_modified = resp.headers.get('Last-Modified')
+                    if etag or last_modified:
+                        cache.set(story_id, (etag, last_modified, payload))
+                    return payload
 
-    def _extract_tag(self, tags, category):
-        """Modified tag extraction to support the new Project color #D351CF."""
-        if not tags:
-            return "Not specified"
-
-        priority_keywords = {'urgent', 'moderate', 'low'}
-        WORK_COLOR = '#51CFD3'
-        PROJECT_TYPE_COLOR = '#5178D3'
-        PROJECT_NAME_COLOR = '#D351CF' # New Color Mapping
+            attempts += 1
+            if attempts >= 3:
+                raise FirewallBlocked("History endpoint kept returning HTML challenge pages")
+            backoff = min(10, 2 ** attempts) + random.random()
+            await asyncio.sleep(backoff)
+    
+    # Color → category dispatch table (includes the Project color #d351cf).
+    # Keys are lowercase because that is how Taiga serializes tag colors,
+    # so no per-tag case conversion is needed in the hot loop.
+    _CAT_BY_COLOR = {
+        '#51cfd3': 'work',
+        '#5178d3': 'project_type',
+        '#d351cf': 'project_name',
+    }
+    _PRIORITY_KW = frozenset({'urgent', 'moderate', 'low'})
 
+    def _classify_tags(self, tags):
+        """Scan the tag list once and bucket all four categories in one pass."""
+        cats = dict.fromkeys(('priority', 'project_type', 'work', 'project_name'),
+                             "Not specified")
         for tag in tags:
             if tag is None: continue
-            
+
             if isinstance(tag, list) and len(tag) >= 2:
                 label = str(tag[0])
-                color = str(tag[1]).upper() 
-                
-                if category == 'priority' and label.lower() in priority_keywords:
-                    return label.lower()
-                elif category == 'project_type' and color == PROJECT_TYPE_COLOR:
-                    return label
-                elif category == 'work' and color == WORK_COLOR:
-                    return label
-                elif category == 'project_name' and color == PROJECT_NAME_COLOR: # New Feature
-                    return label
+                if label.lower() in self._PRIORITY_KW:
+                    if cats['priority'] == "Not specified":
+                        cats['priority'] = label.lower()
+                    continue
+                category = self._CAT_BY_COLOR.get(str(tag[1]))
+                if category and cats[category] == "Not specified":
+                    cats[category] = label
             else:
                 # Support for string-based tags like "project_name:MyProject"
-                tag_str = str(tag).lower()
-                if f"{category.lower()}:" in tag_str:
-                    parts = str(tag).split(':', 1)
-                    return parts[1].strip() if len(parts) > 1 else str(tag).strip()
-        return "Not specified"
-
-    def _get_status_name(self, story):
-        """Improved status name extraction using pre-loaded status_map."""
-        status_info = getattr(story, 'status_extra', None)
-        if status_info and status_info.get('name'):
-            return status_info.get('name')
-            
-        status_id = getattr(story, 'status', None)
-        return self.status_map.get(status_id, f"Unknown ID: {status_id}")
+                prefix, sep, value = str(tag).partition(':')
+                prefix = prefix.strip().lower()
+                if sep and prefix in cats and cats[prefix] == "Not specified":
+                    cats[prefix] = value.strip()
+        return cats
@@ -1,28 +1,90 @@
 
 # modules/processor.py
 import pandas as pd
+import numpy as np
 import holidays
-from datetime import datetime, timedelta, timezone
-import pytz
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
 import streamlit as st
+from functools import lru_cache
+
+# Numba compiles the day-stepping kernel to machine code; without it the
+# NumPy fallback below is used
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _office_seconds(start_s, end_s, workday_lut, lut_base_day, office_start_s, office_end_s):
+        """Sum office-window overlap in local wall-clock seconds.
+
+        workday_lut is one uint8 per day (1 = working day) starting at
+        day lut_base_day; office window bounds are seconds after local
+        midnight. Days outside the table fall back to a weekday check,
+        matching the original behaviour of the bounded holiday set.
+        """
+        total = 0.0
+        day = np.int64(start_s // 86400)
+        last_day = np.int64(end_s // 86400)
+        while day <= last_day:
+            idx = day - lut_base_day
+            if 0 <= idx < workday_lut.size:
+                working = workday_lut[idx] != 0
+            else:
+                working = (day + 3) % 7 < 5  # day 0 (1970-01-01) was a Thursday
+            if working:
+                lo = max(day * 86400 + office_start_s, start_s)
+                hi = min(day * 86400 + office_end_s, end_s)
+                if hi > lo:
+                    total += hi - lo
+            day += 1
+        return total
+else:
+    _office_seconds = None
+
+@lru_cache(maxsize=None)
+def _country_holidays(country_code, years):
+    """Holiday dates for the given years, built once per (country, years).
+
+    Iterating holidays.CountryHoliday is the slow part of processor
+    startup; the result only changes when the year rolls over.
+    """
+    holiday_dates = []
+    for year in years:
+        holiday_dates.extend(holidays.CountryHoliday(country_code, years=[year]).keys())
+    return frozenset(holiday_dates)
 
 class TaigaProcessor:
     def __init__(self):
         # Access secrets directly instead of using Config class
-        self.local_tz = pytz.timezone(st.secrets["TIMEZONE"])
+        self.local_tz = ZoneInfo(st.secrets["TIMEZONE"])
         self.holidays = self._load_holidays()
+        # Branchless workday lookup: one byte per day over the loaded
+        # holiday span, 1 = working day, 0 = weekend or holiday. A single
+        # memory load replaces the weekday branch plus holiday-set probe.
+        holidays_np = np.array(sorted(self.holidays), dtype='datetime64[D]')
+        year = datetime.now().year
+        span = np.arange(np.datetime64(f'{year - 1}-01-01', 'D'),
+                         np.datetime64(f'{year + 2}-01-01', 'D'))
+        span_ints = span.astype('int64')
+        workday = (((span_ints + 3) % 7) < 5) & ~np.isin(span, holidays_np)
+        self._workday_lut = workday.astype(np.uint8)
+        self._workday_base = int(span_ints[0])
+        # Office-hour boundaries read once - st.secrets is a Mapping with
+        # real lookup cost - and stored as seconds after local midnight,
+        # the form the overlap math consumes directly
+        self._office_start_s = (int(st.secrets["OFFICE_HOURS_START_HOUR"]) * 60
+                                + int(st.secrets["OFFICE_HOURS_START_MIN"])) * 60
+        self._office_end_s = (int(st.secrets["OFFICE_HOURS_END_HOUR"]) * 60
+                              + int(st.secrets["OFFICE_HOURS_END_MIN"])) * 60
     
     def _load_holidays(self):
         current_year = datetime.now().year
-        years = [current_year-1, current_year, current_year + 1]
-        
-        holiday_dates = []
-        for year in years:
-            # Access country code from secrets
-            country_holidays = holidays.CountryHoliday(st.secrets["COUNTRY_CODE"], years=[year])
-            holiday_dates.extend(list(country_holidays.keys()))
-        
-        return set(holiday_dates)
+        years = (current_year - 1, current_year, current_year + 1)
+        # Access country code from secrets
+        return _country_holidays(st.secrets["COUNTRY_CODE"], years)
     
     def analyze_time(self, history_entries):
         """Analyze time spent in each status, handling reversions correctly"""
@@ -32,39 +94,37 @@ class TaigaProcessor:
         if not history_entries:
             return {status: "0m" for status in target_statuses}
         
-        # 1. Sort history chronologically
-        status_changes = []
+        # 1. Collect the raw timestamps and parse them in one vectorized
+        # call - per-entry pd.to_datetime pays the parser setup every time,
+        # and format= skips format inference entirely
+        raw_dates = []
+        new_statuses = []
         for entry in history_entries:
             v_diff = entry.get('values_diff', {})
             if 'status' in v_diff:
-                status_changes.append({
-                    'Date': pd.to_datetime(entry.get('created_at')),
-                    'To': v_diff['status'][1]
-                })
-        
-        if not status_changes:
+                raw_dates.append(entry.get('created_at'))
+                new_statuses.append(v_diff['status'][1])
+
+        if not raw_dates:
             return {status: "0m" for status in target_statuses}
-        
-        df_h = pd.DataFrame(status_changes).sort_values('Date').reset_index(drop=True)
-        
-        # 2. Use a "Pointer" logic to calculate intervals between changes
-        for i in range(len(df_h)):
-            current_status = df_h.iloc[i]['To']
-            start_time = df_h.iloc[i]['Date']
-            
-            # Determine the end of this specific interval
-            if i + 1 < len(df_h):
-                end_time = df_h.iloc[i+1]['Date']
-            else:
-                # If it's the current status, calculate up to right now
-                end_time = datetime.now(timezone.utc)
-                
-            # 3. Add to the accumulator ONLY if it's one of our tracked statuses
+
+        parsed = pd.to_datetime(raw_dates, utc=True, format='ISO8601')
+        status_changes = sorted(zip(parsed, new_statuses))
+
+        # 2. Walk the transitions pairwise; the last interval runs up to
+        # right now
+        dates = [change[0] for change in status_changes]
+        statuses = [change[1] for change in status_changes]
+        end_times = dates[1:] + [datetime.now(timezone.utc)]
+
+        # 3. Add to the accumulator ONLY if it's one of our tracked statuses
+        for current_status, start_time, end_time in zip(statuses, dates, end_times):
             if current_status in durations_minutes:
                 interval_mins = self._calculate_office_minutes(start_time, end_time)
                 # Use max(0, ...) to safety-guard against any clock drift/API anomalies
                 durations_minutes[current_status] += max(0, interval_mins)
-                
+
+
         # 4. Format the final accumulated totals
         return {s: self._format_duration(durations_minutes[s]) for s in target_statuses}
     
@@ -72,34 +132,46 @@ class TaigaProcessor:
         if pd.isna(start_utc) or pd.isna(end_utc) or start_utc >= end_utc:
             return 0
         
-        start_local = start_utc.astimezone(self.local_tz)
-        end_local = end_utc.astimezone(self.local_tz)
-        total_minutes = 0
-        current_day = start_local.date()
-        
-        while current_day <= end_local.date():
-            if current_day.weekday() < 5 and current_day not in self.holidays:
-                # Use secrets for office hours
-                work_start = self.local_tz.localize(
-                    datetime.combine(current_day, datetime.min.time().replace(
-                        hour=int(st.secrets["OFFICE_HOURS_START_HOUR"]), 
-                        minute=int(st.secrets["OFFICE_HOURS_START_MIN"])
-                    ))
-                )
-                work_end = self.local_tz.localize(
-                    datetime.combine(current_day, datetime.min.time().replace(
-                        hour=int(st.secrets["OFFICE_HOURS_END_HOUR"]), 
-                        minute=int(st.secrets["OFFICE_HOURS_END_MIN"])
-                    ))
-                )
-                
-                overlap_start = max(start_local, work_start)
-                overlap_end = min(end_local, work_end)
-                
-                if overlap_end > overlap_start:
-                    total_minutes += (overlap_end - overlap_start).total_seconds() / 60
-            current_day += timedelta(days=1)
-        return total_minutes
+        # All math happens in local wall-clock seconds: the interval ends
+        # and the office windows shift together across DST transitions,
+        # so naive comparison stays correct
+        start_local = start_utc.astimezone(self.local_tz).replace(tzinfo=None)
+        end_local = end_utc.astimezone(self.local_tz).replace(tzinfo=None)
+        office_start_s = self._office_start_s
+        office_end_s = self._office_end_s
+
+        epoch = datetime(1970, 1, 1)
+        interval_start = (start_local - epoch).total_seconds()
+        interval_end = (end_local - epoch).total_seconds()
+
+        if _office_seconds is not None:
+            return _office_seconds(interval_start, interval_end,
+                                   self._workday_lut, self._workday_base,
+                                   office_start_s, office_end_s) / 60
+
+        # NumPy fallback: one array entry per calendar day in the interval,
+        # masked through the workday table (weekday-only outside its span)
+        days = np.arange(np.datetime64(start_local.date()),
+                         np.datetime64(end_local.date()) + 1)
+        day_ints = days.astype('int64')
+        idx = day_ints - self._workday_base
+        in_lut = (idx >= 0) & (idx < self._workday_lut.size)
+        working = np.where(
+            in_lut,
+            self._workday_lut[np.clip(idx, 0, self._workday_lut.size - 1)] != 0,
+            ((day_ints + 3) % 7) < 5)  # day 0 (1970-01-01) was a Thursday
+        workdays = days[working]
+        if workdays.size == 0:
+            return 0
+
+        # Office windows per workday, as seconds since the naive epoch
+        day_start_s = workdays.astype('datetime64[s]').astype('int64')
+        work_start = day_start_s + office_start_s
+        work_end = day_start_s + office_end_s
+
+        overlap = (np.minimum(work_end, interval_end)
+                   - np.maximum(work_start, interval_start))
+        return np.clip(overlap, 0, None).sum() / 60
     
     def _format_duration(self, minutes):
         """Format minutes to readable string (1 day = 9 hours)"""
@@ -117,6 +189,13 @@ class TaigaProcessor:
         return f"{hours}h {mins}m"
 
 
+# One processor shared across reruns and sessions: construction reads
+# secrets, localizes the timezone and loads three years of holidays
+@st.cache_resource
+def get_processor():
+    return TaigaProcessor()
+
+
 # # modules/processor.py
 # import pandas as pd
 # import holidays
@@ -46,55 +46,107 @@ class TaigaVisualizer:
         if pd.isna(text) or text == "": return text
         return str(text).replace('_', ' ').title()
 
-    def _duration_to_minutes(self, duration_str):
-        if pd.isna(duration_str) or duration_str in ["0m", "", "Not specified"]:
-            return 0
-        total = 0
-        parts = str(duration_str).split()
-        for part in parts:
-            if 'd' in part: total += int(part.replace('d', '')) * 9 * 60
-            elif 'h' in part: total += int(part.replace('h', '')) * 60
-            elif 'm' in part: total += int(part.replace('m', ''))
-        return total
+    def _clean_col(self, col):
+        """Vectorized _clean_text for whole columns; NaN/empty pass through."""
+        cleaned = col.astype('string').str.replace('_', ' ', regex=False).str.title()
+        return cleaned.mask(col.isna() | (col == ""), col)
+
+    # Parses "Xd Yh Zm" duration strings; missing units fall out as NaN
+    _DURATION_RE = r'(?:(\d+)d)?\s*(?:(\d+)h)?\s*(?:(\d+)m)?'
+
+    def _duration_col_to_minutes(self, col):
+        """Vectorized "Xd Yh Zm" → minutes (1 day = 9 office hours)."""
+        parts = (col.astype(str)
+                 .str.extract(self._DURATION_RE)
+                 .fillna(0).astype(int))
+        return (parts[0] * 540 + parts[1] * 60 + parts[2]).to_numpy()
 
     def _format_mins_to_hm(self, x, pos=None):
-        hours = int(x // 60)
-        minutes = int(x % 60)
+        hours, minutes = divmod(int(x), 60)
         return f"{hours}h {minutes}m"
 
     def _format_mins_to_dhm(self, x):
         """1 Day = 9 Office Hours (540 minutes)"""
-        mins_in_day = 540 
-        
-        days = int(x // mins_in_day)
-        remaining_mins_after_days = x % mins_in_day
-        
-        rem_hours = int(remaining_mins_after_days // 60)
-        rem_mins = int(remaining_mins_after_days % 60)
-        
+        days, remaining = divmod(int(x), 540)
+        rem_hours, rem_mins = divmod(remaining, 60)
+
         res = []
         if days > 0: res.append(f"{days}d")
         if rem_hours > 0: res.append(f"{rem_hours}h")
         res.append(f"{rem_mins}m")
         return " ".join(res)
 
+    def _format_mins_to_hm_vec(self, arr):
+        """Vectorized version of _format_mins_to_hm for whole columns."""
+        arr = np.asarray(arr, dtype=np.int64)
+        hours, minutes = np.divmod(arr, 60)
+        return [f"{h}h {m}m" for h, m in zip(hours, minutes)]
+
+    def _format_mins_to_dhm_vec(self, arr):
+        """Vectorized version of _format_mins_to_dhm (1 day = 540 office minutes)."""
+        arr = np.asarray(arr, dtype=np.int64)
+        days, rem = np.divmod(arr, 540)
+        hours, minutes = np.divmod(rem, 60)
+        out = []
+        for d, h, m in zip(days, hours, minutes):
+            res = []
+            if d > 0: res.append(f"{d}d")
+            if h > 0: res.append(f"{h}h")
+            res.append(f"{m}m")
+            out.append(" ".join(res))
+        return out
+
     def _prepare_data(self):
-        self.df['Assigned To'] = self.df['Assigned To'].apply(self._clean_text)
-        self.df['Project Type'] = self.df['Project Type'].apply(self._clean_text)
-        self.df['Work Type'] = self.df['Work Type'].apply(self._clean_text)
+        self.df['Assigned To'] = self._clean_col(self.df['Assigned To'])
+        self.df['Project Type'] = self._clean_col(self.df['Project Type'])
+        self.df['Work Type'] = self._clean_col(self.df['Work Type'])
         self.df['Points'] = pd.to_numeric(self.df['Points'], errors='coerce').fillna(1).replace(0, 1)
         if 'Project' in self.df.columns:
-            self.df['Project'] = self.df['Project'].apply(self._clean_text)
+            self.df['Project'] = self._clean_col(self.df['Project'])
 
+        # All five duration columns live in one int32 (rows x statuses)
+        # matrix - the plot aggregations are pure NumPy over it. The
+        # sentinels ("0m", "", "Not specified", NaN) all extract to 0.
+        # Only 'In progress_mins' is also kept as a real column, for the
+        # performance table and the efficiency ratio.
+        mins_cols = []
         for status in self.target_statuses:
-            col_mins = f'{status}_mins'
             if status in self.df.columns:
-                self.df[col_mins] = self.df[status].apply(self._duration_to_minutes)
+                mins_cols.append(self._duration_col_to_minutes(self.df[status]))
             else:
-                self.df[col_mins] = 0
-        
+                mins_cols.append(np.zeros(len(self.df), dtype=np.int64))
+        self._mins_matrix = np.stack(mins_cols, axis=1).astype(np.int32)
+        self._status_idx = {s: i for i, s in enumerate(self.target_statuses)}
+        self.df['In progress_mins'] = self._mins_matrix[:, self._status_idx['In progress']]
+
         self.df['Mins_Per_Unit'] = self.df['In progress_mins'] / self.df['Points']
 
+        # Grouping dimensions as category dtype: every groupby below then
+        # hashes small integer codes instead of Python strings. Columns
+        # arriving already categorical just shed the filtered-out values,
+        # so the plots keep showing only observed categories.
+        for col in ('Assigned To', 'Project Type', 'Work Type', 'Priority', 'Status', 'Project'):
+            if col in self.df.columns:
+                if isinstance(self.df[col].dtype, pd.CategoricalDtype):
+                    self.df[col] = self.df[col].cat.remove_unused_categories()
+                else:
+                    self.df[col] = self.df[col].astype('category')
+
+    def _mins_by_assignee(self):
+        """Per-assignee row counts and summed minutes from the matrix.
+
+        Rows align with the 'Assigned To' categories; sums runs one
+        bincount over the group codes per status column.
+        """
+        codes = self.df['Assigned To'].cat.codes.to_numpy()
+        cats = self.df['Assigned To'].cat.categories
+        counts = np.bincount(codes, minlength=len(cats))
+        sums = np.empty((len(cats), len(self.target_statuses)), dtype=np.float64)
+        for j in range(sums.shape[1]):
+            sums[:, j] = np.bincount(codes, weights=self._mins_matrix[:, j],
+                                     minlength=len(cats))
+        return cats, counts, sums
+
     def _apply_modern_style(self, ax):
         sns.despine(ax=ax, left=True, bottom=True)
         ax.grid(True, axis='x', linestyle='--', alpha=0.3)
@@ -103,7 +155,8 @@ class TaigaVisualizer:
     def _add_labels(self, ax, is_horizontal=False, is_time=False):
         for p in ax.patches:
             val = p.get_width() if is_horizontal else p.get_height()
-            if val <= 0 or np.isnan(val): continue
+            # val != val is the NaN check without a NumPy ufunc dispatch
+            if val <= 0 or val != val: continue
             label = self._format_mins_to_hm(val) if is_time else f'{val:.0f}'
             if is_horizontal:
                 ax.annotate(label, (p.get_width(), p.get_y() + p.get_height() / 2.),
@@ -113,16 +166,16 @@ class TaigaVisualizer:
                             ha='center', va='bottom', xytext=(0, 8), textcoords='offset points', color='#555555')
 
     def plot_status_distribution(self):
-        plt.figure(figsize=(10, 5))
-        ax = sns.countplot(data=self.df, y='Status', hue='Status', palette='pastel', legend=False)
+        fig, ax = plt.subplots(figsize=(10, 5))
+        sns.countplot(data=self.df, y='Status', hue='Status', palette='pastel', legend=False, ax=ax)
         self._add_labels(ax, is_horizontal=True)
         self._apply_modern_style(ax)
-        plt.title('Status Distribusi', pad=20, weight='bold')
-        
+        ax.set_title('Status Distribusi', pad=20, weight='bold')
+        return fig
 
     def plot_priority_pie(self):
-        plt.figure(figsize=(7, 7))
-        
+        fig, ax = plt.subplots(figsize=(7, 7))
+
         # 1. Define colors and get counts
         p_colors = {'urgent': '#ff6b6b', 'moderate': '#ffd93d', 'low': '#6bcb77'}
         p_counts = self.df['Priority'].value_counts()
@@ -130,41 +183,43 @@ class TaigaVisualizer:
 
         # 2. Create the donut chart
         # We hide the labels on the wedges to use the legend instead
-        plt.pie(p_counts, labels=None, autopct='%1.1f%%', startangle=140,
-                colors=[p_colors.get(x, '#eee') for x in p_counts.index], 
-                pctdistance=0.85, wedgeprops={'edgecolor': 'white', 'linewidth': 3})
-        
+        ax.pie(p_counts, labels=None, autopct='%1.1f%%', startangle=140,
+               colors=[p_colors.get(x, '#eee') for x in p_counts.index],
+               pctdistance=0.85, wedgeprops={'edgecolor': 'white', 'linewidth': 3})
+
         # 3. Add the center circle and "Total Kartu" text
         center_circle = plt.Circle((0,0), 0.70, fc='white')
-        plt.gca().add_artist(center_circle)
-        
+        ax.add_artist(center_circle)
+
         # Display Total Kartu in the center
-        plt.text(0, 0, f'Total Kartu\n{total_cards}', ha='center', va='center', 
-                 weight='bold', fontsize=14, color='#333333')
+        ax.text(0, 0, f'Total Kartu\n{total_cards}', ha='center', va='center',
+                weight='bold', fontsize=14, color='#333333')
 
         # 4. Create a custom legend showing numbers
         # Format: "Urgent (5)"
         legend_labels = [f'{self._clean_text(idx)} ({p_counts[idx]})' for idx in p_counts.index]
-        plt.legend(legend_labels, title="Prioritas", loc="center left", 
-                   bbox_to_anchor=(1, 0, 0.5, 1), frameon=False)
+        ax.legend(legend_labels, title="Prioritas", loc="center left",
+                  bbox_to_anchor=(1, 0, 0.5, 1), frameon=False)
 
-        plt.title('Prioritas Pekerjaan', weight='bold', pad=20)
-        
+        ax.set_title('Prioritas Pekerjaan', weight='bold', pad=20)
+        return fig
 
     def show_performance_table(self):
-        perf = self.df.groupby('Assigned To').agg({
-            'ID': 'count',
-            'Points': 'sum',
-            'In progress_mins': 'sum'
-        }).rename(columns={'ID': 'Jumlah Kartu', 'Points': 'Total Unit Pekerjaan'})
+        # One groupby pass: all five aggregations share a single hash index
+        perf = self.df.groupby('Assigned To', sort=False, observed=True).agg(**{
+            'Jumlah Kartu': ('ID', 'count'),
+            'Total Unit Pekerjaan': ('Points', 'sum'),
+            'In progress_mins': ('In progress_mins', 'sum'),
+            'Tipe Proyek': ('Project Type', lambda s: ', '.join(pd.unique(s))),
+            'Tipe Pekerjaan': ('Work Type', lambda s: ', '.join(pd.unique(s))),
+        })
 
         # New Days Hours Minutes Format
-        perf['Total Durasi In Progress'] = perf['In progress_mins'].apply(self._format_mins_to_dhm)
-        perf['Efisiensi (Waktu/Unit)'] = (perf['In progress_mins'] / perf['Total Unit Pekerjaan']).apply(self._format_mins_to_hm)
-        
-        perf['Tipe Proyek'] = self.df.groupby('Assigned To')['Project Type'].apply(lambda x: ', '.join(x.unique()))
-        perf['Tipe Pekerjaan'] = self.df.groupby('Assigned To')['Work Type'].apply(lambda x: ', '.join(x.unique()))
-        
+        perf['Total Durasi In Progress'] = self._format_mins_to_dhm_vec(
+            perf['In progress_mins'].to_numpy())
+        perf['Efisiensi (Waktu/Unit)'] = self._format_mins_to_hm_vec(
+            (perf['In progress_mins'] / perf['Total Unit Pekerjaan']).to_numpy())
+
         # Drop raw minutes before display
         display_df = perf.drop(columns=['In progress_mins'])
         
@@ -172,53 +227,52 @@ class TaigaVisualizer:
         # display(display_df.sort_values('Total Unit Pekerjaan', ascending=False))
 
     def plot_priority_mix_stacked(self):
-        plt.figure(figsize=(12, 6))
-        mix = self.df.groupby(['Assigned To', 'Priority'])['Points'].sum().unstack().fillna(0)
+        fig, ax = plt.subplots(figsize=(12, 6))
+        mix = self.df.groupby(['Assigned To', 'Priority'], observed=True)['Points'].sum().unstack().fillna(0)
         available_cols = [c for c in ['low', 'moderate', 'urgent'] if c in mix.columns]
         mix = mix[available_cols]
         color_map = {'low': '#6bcb77', 'moderate': '#ffd93d', 'urgent': '#ff6b6b'}
-        
-        ax = mix.plot(kind='barh', stacked=True, ax=plt.gca(), 
-                      color=[color_map[c] for c in available_cols], edgecolor='white', linewidth=1)
-        
-        self._apply_modern_style(plt.gca())
-        plt.title('Komposisi Prioritas per Personil', pad=20, weight='bold')
-        plt.legend(title='Priority', bbox_to_anchor=(1.05, 1), loc='upper left', frameon=False)
-        
+
+        mix.plot(kind='barh', stacked=True, ax=ax,
+                 color=[color_map[c] for c in available_cols], edgecolor='white', linewidth=1)
+
+        self._apply_modern_style(ax)
+        ax.set_title('Komposisi Prioritas per Personil', pad=20, weight='bold')
+        ax.legend(title='Priority', bbox_to_anchor=(1.05, 1), loc='upper left', frameon=False)
+        return fig
 
     def plot_efficiency_by_priority(self):
             """Menampilkan rata-rata waktu per unit berdasarkan prioritas dengan gaya modern"""
-            plt.figure(figsize=(10, 5))
-            
+            fig, ax = plt.subplots(figsize=(10, 5))
+
             # Mengambil rata-rata menit per unit dan diurutkan berdasarkan prioritas
-            eff_data = self.df.groupby('Priority')['Mins_Per_Unit'].mean().reindex(['urgent', 'moderate', 'low']).dropna()
-            
+            eff_data = self.df.groupby('Priority', observed=True)['Mins_Per_Unit'].mean().reindex(['urgent', 'moderate', 'low']).dropna()
+
             # Palet warna Apple-like
             p_colors = {'urgent': '#ff6b6b', 'moderate': '#ffd93d', 'low': '#6bcb77'}
-            
-            ax = sns.barplot(x=eff_data.index, y=eff_data.values, hue=eff_data.index, 
-                             palette=p_colors, legend=False)
-            
+
+            sns.barplot(x=eff_data.index, y=eff_data.values, hue=eff_data.index,
+                        palette=p_colors, legend=False, ax=ax)
+
             # Tambahkan label waktu (Hh Mm) di atas bar
             self._add_labels(ax, is_time=True)
-            
+
             # Terapkan gaya modern dan format sumbu Y
             self._apply_modern_style(ax)
             ax.yaxis.set_major_formatter(FuncFormatter(self._format_mins_to_hm))
-            
-            plt.title('Rata-rata Waktu per Unit Pekerjaan', pad=20, weight='bold')
-            plt.ylabel('Durasi (Jam & Menit)')
-            
-    
+
+            ax.set_title('Rata-rata Waktu per Unit Pekerjaan', pad=20, weight='bold')
+            ax.set_ylabel('Durasi (Jam & Menit)')
+            return fig
+
     def plot_bottleneck_analysis(self):
         """Analisis Bottleneck untuk setiap fase proses"""
-        plt.figure(figsize=(12, 5))
-        
+        fig, ax = plt.subplots(figsize=(12, 5))
+
         # Menghitung rata-rata waktu untuk setiap status target
-        avg_times = [self.df[f'{s}_mins'].mean() for s in self.target_statuses]
-        
+        avg_times = self._mins_matrix.mean(axis=0) if len(self.df) else np.zeros(len(self.target_statuses))
+
         # Menggunakan warna biru muda yang bersih (Apple-style)
-        ax = plt.gca()
         bars = ax.bar(self.target_statuses, avg_times, color='#74b9ff', edgecolor='white', linewidth=1)
         
         # Tambahkan label waktu di atas bar
@@ -232,52 +286,50 @@ class TaigaVisualizer:
         # Terapkan gaya modern dan format sumbu Y
         self._apply_modern_style(ax)
         ax.yaxis.set_major_formatter(FuncFormatter(self._format_mins_to_hm))
-        
-        plt.title('Analisis Bottleneck: Rata-rata Waktu per Fase', pad=20, weight='bold')
-        plt.ylabel('Durasi (Jam & Menit)')
-        plt.xticks(rotation=0) # Tetap horizontal agar bersih
-        
+
+        ax.set_title('Analisis Bottleneck: Rata-rata Waktu per Fase', pad=20, weight='bold')
+        ax.set_ylabel('Durasi (Jam & Menit)')
+        ax.tick_params(axis='x', rotation=0) # Tetap horizontal agar bersih
+        return fig
 
     def plot_total_work_units(self):
         """The New Graph: Plotting 'Total Unit Pekerjaan' per Personnel"""
-        plt.figure(figsize=(10, 6))
-        summary = self.df.groupby('Assigned To')['Points'].sum().sort_values()
-        ax = sns.barplot(x=summary.values, y=summary.index, hue=summary.index, palette='pastel', legend=False)
+        fig, ax = plt.subplots(figsize=(10, 6))
+        summary = self.df.groupby('Assigned To', observed=True)['Points'].sum().sort_values()
+        sns.barplot(x=summary.values, y=summary.index, hue=summary.index, palette='pastel', legend=False, ax=ax)
         self._add_labels(ax, is_horizontal=True)
         self._apply_modern_style(ax)
-        plt.title('Total Unit Pekerjaan (Poin) per Personil', pad=20, weight='bold')
-        plt.xlabel('Jumlah Unit Pekerjaan')
-        
+        ax.set_title('Total Unit Pekerjaan (Poin) per Personil', pad=20, weight='bold')
+        ax.set_xlabel('Jumlah Unit Pekerjaan')
+        return fig
 
     def plot_connection_heatmap(self):
         """Visualizing the relationship between Project Type and Work Type"""
-        plt.figure(figsize=(12, 8))
-        
-        # Create the pivot table for the heatmap
-        pivot_df = self.df.pivot_table(
-            index='Work Type', 
-            columns='Project Type', 
-            values='Subject', 
-            aggfunc='count'
-        ).fillna(0)
-        
+        fig, ax = plt.subplots(figsize=(12, 8))
+
+        # Count the pairs in one crosstab pass (zeros filled for free) -
+        # pivot_table built a groupby + unstack intermediate for the same
+        pivot_df = pd.crosstab(self.df['Work Type'], self.df['Project Type'])
+
         # Plot using a clean, modern color map
         sns.heatmap(
-            pivot_df, 
-            annot=True, 
-            fmt=".0f", 
-            cmap="YlGnBu", 
-            cbar=False, 
-            linewidths=.5, 
-            annot_kws={"size": 10}
+            pivot_df,
+            annot=True,
+            fmt=".0f",
+            cmap="YlGnBu",
+            cbar=False,
+            linewidths=.5,
+            annot_kws={"size": 10},
+            ax=ax
         )
-        
-        plt.title('Koneksi: Tipe Proyek vs Tipe Pekerjaan', pad=20, weight='bold')
-        plt.xlabel('Tipe Proyek', labelpad=10)
-        plt.ylabel('Tipe Pekerjaan', labelpad=10)
-        
+
+        ax.set_title('Koneksi: Tipe Proyek vs Tipe Pekerjaan', pad=20, weight='bold')
+        ax.set_xlabel('Tipe Proyek', labelpad=10)
+        ax.set_ylabel('Tipe Pekerjaan', labelpad=10)
+
         # Modern cleanup: Remove tick marks
-        plt.tick_params(axis='both', which='both', length=0)
+        ax.tick_params(axis='both', which='both', length=0)
+        return fig
 
     def plot_project_assignment_matrix(self):
         """
@@ -290,129 +342,122 @@ class TaigaVisualizer:
         # 1. Prepare and Sort Data
         report_df = self.df[['Project', 'Subject', 'Assigned To', 'Status']].copy()
         
-        # Robust replacement for "Various Projects"
-        report_df['Project'] = report_df['Project'].replace({
+        # Robust replacement for "Various Projects"; via str since the
+        # replacement is not one of the column's categories
+        report_df['Project'] = report_df['Project'].astype(str).replace({
             'Not specified': 'Various Projects',
             'not specified': 'Various Projects',
             'Not Specified': 'Various Projects'
-        })
+        }).astype('category')
 
         status_order = ['To Do', 'In progress', 'Peer Review', 'Need Approval','Approved', 'Submitted']
         report_df['Status'] = pd.Categorical(report_df['Status'], categories=status_order, ordered=True)
-        
-        # 2. Setup Plotting (Horizontal and Narrow)
-        n_projects = len(report_df['Project'].unique())
+
+        # 2. Aggregate the counts once - countplot would redo this groupby
+        # internally and leave the values locked inside patch geometry.
+        # Rows are reversed so the first project renders at the top.
+        counts = (pd.crosstab(report_df['Project'], report_df['Status'], dropna=False)
+                  .reindex(columns=status_order, fill_value=0)
+                  .iloc[::-1])
+
         # Compact vertical scaling: multiplier reduced to 0.45 for a narrower profile
-        fig_height = max(3, n_projects * 0.45) 
-        
-        fig = plt.figure(figsize=(12, fig_height))
-        
-        # Use y='Project' for horizontal layout to accommodate long names
-        ax = sns.countplot(
-            data=report_df, 
-            y='Project', 
-            hue='Status', 
-            hue_order=status_order, 
-            palette='pastel'
-        )
+        n_projects = len(counts)
+        fig_height = max(3, n_projects * 0.45)
 
-        # 3. Horizontal Annotations (Labels next to dots/bars)
-        for p in ax.patches:
-            width = p.get_width()
-            if width > 0:
-                ax.annotate(f'{int(width)}', 
-                            (width, p.get_y() + p.get_height() / 2.), 
-                            ha='left', va='center', 
-                            xytext=(5, 0), textcoords='offset points',
-                            fontsize=9, color='#555555', weight='semibold')
+        fig, ax = plt.subplots(figsize=(12, fig_height))
+
+        # Horizontal layout to accommodate long project names
+        counts.plot(kind='barh', ax=ax,
+                    color=sns.color_palette('pastel', len(status_order)))
+
+        # 3. Horizontal Annotations from the precomputed counts (the patch
+        # only supplies the label position, never the value)
+        for container, status in zip(ax.containers, counts.columns):
+            for patch, value in zip(container, counts[status].to_numpy()):
+                if value > 0:
+                    ax.annotate(f'{int(value)}',
+                                (patch.get_width(), patch.get_y() + patch.get_height() / 2.),
+                                ha='left', va='center',
+                                xytext=(5, 0), textcoords='offset points',
+                                fontsize=9, color='#555555', weight='semibold')
 
         self._apply_modern_style(ax)
-        
+
         # Cleanup for Apple-style: focus on labels instead of axis lines
-        ax.xaxis.set_visible(False) 
-        sns.despine(left=False, bottom=True)
-        
-        plt.title('Card Volume per Project & Status', pad=15, weight='bold', fontsize=12)
-        plt.ylabel('')
-        plt.legend(title='Status', bbox_to_anchor=(1.02, 1), loc='upper left', frameon=False, fontsize=9)
-        plt.tight_layout()
+        ax.xaxis.set_visible(False)
+        sns.despine(ax=ax, left=False, bottom=True)
+
+        ax.set_title('Card Volume per Project & Status', pad=15, weight='bold', fontsize=12)
+        ax.set_ylabel('')
+        ax.legend(title='Status', bbox_to_anchor=(1.02, 1), loc='upper left', frameon=False, fontsize=9)
+        fig.tight_layout()
 
         # --- PART B: Return values (Exact match for app.py) ---
         return fig, report_df
     
     def plot_personnel_bottleneck_comparison(self):
         """Analisis Bottleneck per Personil dalam satu grafik"""
-        # Maintain your existing logic...
-        plt.figure(figsize=(14, 7))
-        status_cols = [f'{s}_mins' for s in self.target_statuses]
-        melted_df = self.df.melt(
-            id_vars=['Assigned To'], 
-            value_vars=status_cols, 
-            var_name='Status', 
-            value_name='Minutes'
-        )
-        melted_df['Status'] = melted_df['Status'].str.replace('_mins', '')
-        
-        ax = sns.barplot(
-            data=melted_df, 
-            x='Assigned To', 
-            y='Minutes', 
-            hue='Status', 
-            hue_order=self.target_statuses,
-            palette='pastel',
-            errorbar=None
-        )
-        
+        fig, ax = plt.subplots(figsize=(14, 7))
+
+        # Aggregate the minutes matrix directly: melt + barplot would build
+        # a 5x long frame only for seaborn to re-group it into these means
+        cats, counts, sums = self._mins_by_assignee()
+        means = pd.DataFrame(sums / np.maximum(counts, 1)[:, None],
+                             index=cats, columns=self.target_statuses)
+
+        means.plot(kind='bar', ax=ax,
+                   color=sns.color_palette('pastel', len(self.target_statuses)),
+                   edgecolor='white', linewidth=1)
+
         self._apply_modern_style(ax)
         ax.yaxis.set_major_formatter(FuncFormatter(self._format_mins_to_hm))
-        
-        plt.title('Perbandingan Bottleneck Antar Personil (Rata-rata Waktu)', pad=25, weight='bold')
-        plt.ylabel('Durasi (Jam & Menit)')
-        plt.xlabel('Nama Personil')
-        plt.xticks(rotation=45)
-        plt.legend(title='Fase Kerja', bbox_to_anchor=(1.05, 1), loc='upper left', frameon=False)
-        plt.tight_layout()
-        
-        return plt.gcf() # RETURN instead of plt.show()
+
+        ax.set_title('Perbandingan Bottleneck Antar Personil (Rata-rata Waktu)', pad=25, weight='bold')
+        ax.set_ylabel('Durasi (Jam & Menit)')
+        ax.set_xlabel('Nama Personil')
+        ax.tick_params(axis='x', rotation=45)
+        ax.legend(title='Fase Kerja', bbox_to_anchor=(1.05, 1), loc='upper left', frameon=False)
+        fig.tight_layout()
+
+        return fig
 
     def plot_bottleneck_heatmap(self):
         """Efficiency Heatmap: Rata-rata menit per Unit Poin (Minutes per Point)."""
-        # Maintain your existing logic...
-        plt.figure(figsize=(14, 8))
-        status_cols = [f'{s}_mins' for s in self.target_statuses]
-        agg_data = self.df.groupby('Assigned To').agg({
-            'Points': 'sum',
-            **{col: 'sum' for col in status_cols}
-        })
-        
-        efficiency_data = pd.DataFrame(index=agg_data.index)
-        for s in self.target_statuses:
-            efficiency_data[s] = agg_data[f'{s}_mins'] / agg_data['Points'].replace(0, 1)
-        
-        ax = sns.heatmap(
-            efficiency_data, 
-            annot=True, 
-            fmt=".1f", 
-            cmap="coolwarm", 
+        fig, ax = plt.subplots(figsize=(14, 8))
+
+        # Group sums come straight off the minutes matrix; one broadcast
+        # division by the zero-guarded point totals yields the efficiency
+        cats, counts, sums = self._mins_by_assignee()
+        pts = np.bincount(self.df['Assigned To'].cat.codes.to_numpy(),
+                          weights=self.df['Points'].to_numpy(dtype=np.float64),
+                          minlength=len(cats))
+        pts[pts == 0] = 1
+        eff_arr = sums / pts[:, None]
+        efficiency_data = pd.DataFrame(eff_arr, index=cats,
+                                       columns=self.target_statuses)
+
+
+        # Labels built once from the numeric array; fmt='' makes seaborn
+        # render them verbatim, so nothing gets float-formatted and then
+        # re-parsed out of ax.texts afterwards
+        labels = np.array([[self._format_mins_to_hm(v) if v > 0 else '-' for v in row]
+                           for row in eff_arr])
+
+        sns.heatmap(
+            efficiency_data,
+            annot=labels,
+            fmt='',
+            cmap="coolwarm",
             cbar_kws={'label': 'Menit per Unit Poin'},
             linewidths=0.5,
-            annot_kws={"size": 10}
+            annot_kws={"size": 10},
+            ax=ax
         )
-        
-        for text in ax.texts:
-            try:
-                val = float(text.get_text())
-                if val > 0:
-                    text.set_text(self._format_mins_to_hm(val))
-                else:
-                    text.set_text("-")
-            except ValueError:
-                continue
-
-        plt.title('Heatmap Efisiensi: Waktu per Unit Pekerjaan ', pad=25, weight='bold', fontsize=16)
-        plt.xlabel('Fase Kerja', labelpad=15)
-        plt.ylabel('Nama Personil', labelpad=15)
-        plt.tick_params(axis='both', which='both', length=0)
-        plt.tight_layout()
-        
-        return plt.gcf() # RETURN instead of plt.show()
\ No newline at end of file
+
+        ax.set_title('Heatmap Efisiensi: Waktu per Unit Pekerjaan ', pad=25, weight='bold', fontsize=16)
+        ax.set_xlabel('Fase Kerja', labelpad=15)
+        ax.set_ylabel('Nama Personil', labelpad=15)
+        ax.tick_params(axis='both', which='both', length=0)
+        fig.tight_layout()
+
+        return fig
\ No newline at end of file